@@ -150,7 +150,7 @@ def run_check(owner_repo: str, pr_number: int) -> int:
     wait_seconds = _parse_wait_seconds(body)
     if wait_seconds is None:
         print("Error: Could not parse wait time from rate limit message.")
-        snippet = "\n".join(body.split("\n")[:10])
+        snippet = "\n".join(body.split("\n", 10)[:10])
         print(f"Comment snippet:\n{snippet}")
         return 1
 
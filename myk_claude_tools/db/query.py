@@ -20,6 +20,9 @@ from pathlib import Path
 from typing import Any
 from urllib.parse import quote
 
+# Word tokens used for body similarity
+_WORD_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
 
 def log(message: str) -> None:
     """Print message to stderr."""
@@ -53,8 +56,8 @@ def _get_git_root() -> Path:
 
 def _body_similarity(body1: str, body2: str) -> float:
     """Calculate word overlap ratio between two bodies using Jaccard similarity."""
-    tokens1 = set(re.findall(r"[a-z0-9]+", body1.lower()))
-    tokens2 = set(re.findall(r"[a-z0-9]+", body2.lower()))
+    tokens1 = set(_WORD_TOKEN_RE.findall(body1.lower()))
+    tokens2 = set(_WORD_TOKEN_RE.findall(body2.lower()))
     if not tokens1 or not tokens2:
         return 0.0
 
@@ -22,24 +22,30 @@ from typing import Any
 # Compiled patterns
 # ---------------------------------------------------------------------------
 
-# Matches the start of the outer "Outside diff range comments" section.
-_OUTSIDE_SECTION_START_RE = re.compile(
-    r"<summary>\s*(?:\S+\s+)*?Outside diff range comments?\s*(?:\(\d+\))?\s*</summary>\s*<blockquote>",
+# Matches the start of an outer "Outside diff range", "Nitpick" or "Duplicate"
+# comments section, so a single scan finds every section kind. Leading words
+# (e.g. an emoji) exclude "<" so a non-matching <summary> cannot scan past its
+# own tag into the rest of the body, which made matching quadratic on large reviews.
+_SECTION_START_RE = re.compile(
+    r"<summary>\s*(?:[^\s<]+\s+)*?(?P<kind>Outside diff range|Nitpick|Duplicate) comments?\s*(?:\(\d+\))?\s*"
+    r"</summary>\s*<blockquote>",
 )
 
-# Matches the start of the outer "Nitpick comments" section.
-_NITPICK_SECTION_START_RE = re.compile(
-    r"<summary>\s*(?:\S+\s+)*?Nitpick comments?\s*(?:\(\d+\))?\s*</summary>\s*<blockquote>",
-)
+# Maps the section title captured by _SECTION_START_RE to its result key.
+_SECTION_KEYS = {"Outside diff range": "outside_diff", "Nitpick": "nitpick", "Duplicate": "duplicate"}
 
-# Matches the start of the outer "Duplicate comments" section.
-_DUPLICATE_SECTION_START_RE = re.compile(
-    r"<summary>\s*(?:\S+\s+)*?Duplicate comments?\s*(?:\(\d+\))?\s*</summary>\s*<blockquote>",
-)
+# Literal text every section header of each kind contains. Checked with ``in``
+# so bodies without the section skip prefix stripping and the regex scan.
+_SECTION_MARKERS = {
+    "outside_diff": "Outside diff range comment",
+    "nitpick": "Nitpick comment",
+    "duplicate": "Duplicate comment",
+}
 
 # Matches the start of a file-level <details> block with path and count.
+# The path is a negated class so the lazy match cannot run past the </summary> tag.
 _FILE_SUMMARY_RE = re.compile(
-    r"<details>\s*\n?\s*<summary>\s*(?P<path>.+?)\s*(?:\(\d+\))?\s*</summary>\s*<blockquote>",
+    r"<details>\s*\n?\s*<summary>\s*(?P<path>[^<\n]+?)\s*(?:\(\d+\))?\s*</summary>\s*<blockquote>",
 )
 
 # Matches the backtick line-range pattern at the start of a comment.
@@ -54,12 +60,18 @@ _ANNOTATION_RE = re.compile(
     r"_\S*\s*(?P<category>[^_]+?)_\s*\|\s*_\S*\s*(?P<severity>[^_]+?)_",
 )
 
-# Matches the bold title line.
+# Matches the bold title line. The title is any run of non-asterisk characters
+# or single asterisks, so the closing ``**`` is found without lazy backtracking.
 _TITLE_RE = re.compile(
-    r"^\*\*(?P<title>.+?)\*\*",
+    r"^\*\*(?P<title>(?:[^*\n]|\*(?!\*))+)\*\*",
     re.MULTILINE,
 )
 
+# Matches the ``---`` divider between individual comments in a file block.
+_COMMENT_SEPARATOR_RE = re.compile(
+    r"\r?\n---\s*\r?\n",
+)
+
 # Matches the "Prompt for AI Agents" details block (to be excluded).
 _AI_PROMPT_RE = re.compile(
     r"<details>\s*\n?\s*<summary>\s*\S*\s*Prompt for AI Agents\s*</summary>.*?</details>",
@@ -67,6 +79,17 @@ _AI_PROMPT_RE = re.compile(
 )
 
 
+def _strip_ai_prompts(text: str) -> str:
+    """Remove "Prompt for AI Agents" details blocks from text.
+
+    A plain substring check skips the regex for the common case where the
+    text has no AI prompt block.
+    """
+    if "Prompt for AI Agents" not in text:
+        return text
+    return _AI_PROMPT_RE.sub("", text)
+
+
 def _strip_blockquote_prefix(text: str) -> str:
     """Strip the ``>`` prefix from each line of a blockquoted section.
 
@@ -83,25 +106,27 @@ def _strip_blockquote_prefix(text: str) -> str:
     return "\n".join(lines)
 
 
-def _extract_blockquote_content(text: str, start: int) -> str | None:
-    """Extract blockquote content by tracking nesting depth from a given position.
+def _find_blockquote_end(text: str, start: int, end: int | None = None) -> int | None:
+    """Find the matching closing ``</blockquote>`` by tracking nesting depth.
 
     Args:
         text: The full text.
         start: Position immediately after the opening ``<blockquote>`` tag.
+        end: Optional position to stop searching at (defaults to end of text).
 
     Returns:
-        The content between the opening and its matching closing
-        ``</blockquote>`` tag, or ``None`` if no matching close is found.
+        The index of the matching closing ``</blockquote>`` tag, or ``None``
+        if no matching close is found.
     """
     depth = 1
     pos = start
+    limit = len(text) if end is None else end
     bq_open_tag = "<blockquote>"
     bq_close_tag = "</blockquote>"
 
-    while depth > 0 and pos < len(text):
-        next_open = text.find(bq_open_tag, pos)
-        next_close = text.find(bq_close_tag, pos)
+    while depth > 0 and pos < limit:
+        next_open = text.find(bq_open_tag, pos, limit)
+        next_close = text.find(bq_close_tag, pos, limit)
 
         if next_close == -1:
             # No closing tag found at all
@@ -113,7 +138,7 @@ def _extract_blockquote_content(text: str, start: int) -> str | None:
         else:
             depth -= 1
             if depth == 0:
-                return text[start:next_close]
+                return next_close
             pos = next_close + len(bq_close_tag)
 
     return None
@@ -135,7 +160,7 @@ def _parse_single_comment(raw: str) -> dict[str, Any] | None:
     # --- Line range ---
     line: int | None = None
     end_line: int | None = None
-    line_match = _LINE_RANGE_RE.search(text)
+    line_match = _LINE_RANGE_RE.match(text)
     if not line_match:
         return None
 
@@ -147,14 +172,14 @@ def _parse_single_comment(raw: str) -> dict[str, Any] | None:
     # --- Category and severity ---
     category: str = ""
     severity: str = ""
-    ann_match = _ANNOTATION_RE.search(text)
+    ann_match = _ANNOTATION_RE.search(text) if "|" in text else None
     if ann_match:
         category = ann_match.group("category").strip()
         severity = ann_match.group("severity").strip()
 
     # --- Title ---
     title: str = ""
-    title_match = _TITLE_RE.search(text)
+    title_match = _TITLE_RE.search(text) if "**" in text else None
     if title_match:
         title = title_match.group("title").strip()
 
@@ -166,7 +191,7 @@ def _parse_single_comment(raw: str) -> dict[str, Any] | None:
         body_text = text[title_match.end() :].strip()
 
     # Remove AI prompt sections
-    body_text = _AI_PROMPT_RE.sub("", body_text).strip()
+    body_text = _strip_ai_prompts(body_text).strip()
 
     # Build the full body: title + remaining body
     body_parts: list[str] = []
@@ -187,21 +212,25 @@ def _parse_single_comment(raw: str) -> dict[str, Any] | None:
     }
 
 
-def _parse_section_comments(cleaned: str, section_re: re.Pattern[str]) -> list[dict[str, Any]]:
-    """Extract and parse comments from a single section of a cleaned review body.
+def _parse_section_comments(
+    cleaned: str,
+    kinds: tuple[str, ...] = ("outside_diff", "nitpick", "duplicate"),
+) -> dict[str, list[dict[str, Any]]]:
+    """Extract and parse comments from the sections of a cleaned review body.
 
     This is the shared logic for "outside diff range", "nitpick", and "duplicate"
-    sections. The caller is responsible for cleaning the text first (stripping
+    sections. All section kinds are located in a single pass over the text.
+    The caller is responsible for cleaning the text first (stripping
     blockquote prefixes and trailing AI prompt blocks).
 
     Args:
         cleaned: The review body text after blockquote-prefix and AI-prompt
             stripping.
-        section_re: Compiled regex that matches the section's ``<summary>``
-            header (up to and including the opening ``<blockquote>`` tag).
+        kinds: Section kinds to collect (``'outside_diff'``, ``'nitpick'``,
+            ``'duplicate'``); sections of other kinds are skipped.
 
     Returns:
-        List of dicts, each with keys:
+        Dict mapping each requested kind to a list of dicts, each with keys:
         - path: str (file path)
         - line: int (start line)
         - end_line: int | None (end line, or None if single line)
@@ -209,30 +238,40 @@ def _parse_section_comments(cleaned: str, section_re: re.Pattern[str]) -> list[d
         - category: str (e.g., "Potential issue", "Nitpick")
         - severity: str (e.g., "Major", "Trivial")
     """
-    results: list[dict[str, Any]] = []
+    results: dict[str, list[dict[str, Any]]] = {kind: [] for kind in kinds}
+
+    for section_start_match in _SECTION_START_RE.finditer(cleaned):
+        kind_results = results.get(_SECTION_KEYS[section_start_match.group("kind")])
+        if kind_results is None:
+            continue
 
-    for section_start_match in section_re.finditer(cleaned):
-        section_content = _extract_blockquote_content(cleaned, section_start_match.end())
-        if section_content is None:
+        section_start = section_start_match.end()
+        section_end = _find_blockquote_end(cleaned, section_start)
+        if section_end is None:
             continue
 
-        # Extract each file-level block using nesting-aware extraction.
-        for file_match in _FILE_SUMMARY_RE.finditer(section_content):
+        # Extract each file-level block using nesting-aware extraction. The
+        # section is scanned in place via pos/endpos instead of being copied.
+        for file_match in _FILE_SUMMARY_RE.finditer(cleaned, section_start, section_end):
             file_path = file_match.group("path").strip()
-            file_content = _extract_blockquote_content(section_content, file_match.end())
-            if file_content is None:
+            file_end = _find_blockquote_end(cleaned, file_match.end(), section_end)
+            if file_end is None:
                 continue
 
-            file_content = file_content.strip()
-
-            # Split individual comments on --- separators
-            comment_blocks = re.split(r"\r?\n---\s*\r?\n", file_content)
+            # Split individual comments on --- separators, slicing each block
+            # straight out of the body rather than copying the file content first
+            block_start = file_match.end()
+            comment_blocks: list[str] = []
+            for separator in _COMMENT_SEPARATOR_RE.finditer(cleaned, block_start, file_end):
+                comment_blocks.append(cleaned[block_start : separator.start()])
+                block_start = separator.end()
+            comment_blocks.append(cleaned[block_start:file_end])
 
             for block in comment_blocks:
                 parsed = _parse_single_comment(block)
                 if parsed is not None:
                     parsed["path"] = file_path
-                    results.append(parsed)
+                    kind_results.append(parsed)
 
     return results
 
@@ -252,7 +291,7 @@ def parse_outside_diff_comments(body: str) -> list[dict[str, Any]]:
         - category: str (e.g., "Potential issue", "Nitpick")
         - severity: str (e.g., "Major", "Trivial")
     """
-    if not body:
+    if not body or _SECTION_MARKERS["outside_diff"] not in body:
         return []
 
     # Strip blockquote prefixes so we can parse clean HTML
@@ -260,9 +299,9 @@ def parse_outside_diff_comments(body: str) -> list[dict[str, Any]]:
 
     # Also strip a trailing AI prompt section that may appear outside the
     # blockquote at the very end of the review body.
-    cleaned = _AI_PROMPT_RE.sub("", cleaned).strip()
+    cleaned = _strip_ai_prompts(cleaned).strip()
 
-    return _parse_section_comments(cleaned, _OUTSIDE_SECTION_START_RE)
+    return _parse_section_comments(cleaned, ("outside_diff",))["outside_diff"]
 
 
 def parse_nitpick_comments(body: str) -> list[dict[str, Any]]:
@@ -280,7 +319,7 @@ def parse_nitpick_comments(body: str) -> list[dict[str, Any]]:
         - category: str (e.g., "Nitpick")
         - severity: str (e.g., "Trivial")
     """
-    if not body:
+    if not body or _SECTION_MARKERS["nitpick"] not in body:
         return []
 
     # Strip blockquote prefixes so we can parse clean HTML
@@ -288,9 +327,9 @@ def parse_nitpick_comments(body: str) -> list[dict[str, Any]]:
 
     # Also strip a trailing AI prompt section that may appear outside the
     # blockquote at the very end of the review body.
-    cleaned = _AI_PROMPT_RE.sub("", cleaned).strip()
+    cleaned = _strip_ai_prompts(cleaned).strip()
 
-    return _parse_section_comments(cleaned, _NITPICK_SECTION_START_RE)
+    return _parse_section_comments(cleaned, ("nitpick",))["nitpick"]
 
 
 def parse_duplicate_comments(body: str) -> list[dict[str, Any]]:
@@ -308,7 +347,7 @@ def parse_duplicate_comments(body: str) -> list[dict[str, Any]]:
         - category: str (e.g., "Refactor suggestion")
         - severity: str (e.g., "Major")
     """
-    if not body:
+    if not body or _SECTION_MARKERS["duplicate"] not in body:
         return []
 
     # Strip blockquote prefixes so we can parse clean HTML
@@ -316,9 +355,9 @@ def parse_duplicate_comments(body: str) -> list[dict[str, Any]]:
 
     # Also strip a trailing AI prompt section that may appear outside the
     # blockquote at the very end of the review body.
-    cleaned = _AI_PROMPT_RE.sub("", cleaned).strip()
+    cleaned = _strip_ai_prompts(cleaned).strip()
 
-    return _parse_section_comments(cleaned, _DUPLICATE_SECTION_START_RE)
+    return _parse_section_comments(cleaned, ("duplicate",))["duplicate"]
 
 
 def parse_review_body_comments(body: str) -> dict[str, list[dict[str, Any]]]:
@@ -328,14 +367,10 @@ def parse_review_body_comments(body: str) -> dict[str, list[dict[str, Any]]]:
         Dict with keys ``'outside_diff'``, ``'nitpick'``, and ``'duplicate'``,
         each containing a list of parsed comment dicts.
     """
-    if not body:
+    if not body or not any(marker in body for marker in _SECTION_MARKERS.values()):
         return {"outside_diff": [], "nitpick": [], "duplicate": []}
 
     cleaned = _strip_blockquote_prefix(body)
-    cleaned = _AI_PROMPT_RE.sub("", cleaned).strip()
+    cleaned = _strip_ai_prompts(cleaned).strip()
 
-    return {
-        "outside_diff": _parse_section_comments(cleaned, _OUTSIDE_SECTION_START_RE),
-        "nitpick": _parse_section_comments(cleaned, _NITPICK_SECTION_START_RE),
-        "duplicate": _parse_section_comments(cleaned, _DUPLICATE_SECTION_START_RE),
-    }
+    return _parse_section_comments(cleaned)
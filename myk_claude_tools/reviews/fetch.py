@@ -32,6 +32,9 @@ LOW_PRIORITY_KEYWORDS = re.compile(
     re.IGNORECASE,
 )
 
+# Word tokens used for body similarity
+_WORD_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
 # Track temp files for cleanup
 TEMP_FILES: list[Path] = []
 
@@ -53,8 +56,8 @@ def print_stderr(msg: str) -> None:
 
 def _fallback_body_similarity(body1: str, body2: str) -> float:
     """Calculate word overlap ratio between two bodies using Jaccard similarity."""
-    tokens1 = set(re.findall(r"[a-z0-9]+", body1.lower()))
-    tokens2 = set(re.findall(r"[a-z0-9]+", body2.lower()))
+    tokens1 = set(_WORD_TOKEN_RE.findall(body1.lower()))
+    tokens2 = set(_WORD_TOKEN_RE.findall(body2.lower()))
     if not tokens1 or not tokens2:
         return 0.0
 
@@ -888,12 +891,16 @@ def run(review_url: str = "") -> int:
                 specific_threads = fetch_review_comments(owner, repo, pr_number, review_id)
                 print_stderr(f"Found {len(specific_threads)} inline comment(s) from review {review_id}")
 
-                # Also fetch body-embedded comments for CodeRabbit reviews
-                try:
-                    review_meta = fetch_review_body(owner, repo, pr_number, review_id)
-                except (OSError, subprocess.SubprocessError, json.JSONDecodeError) as exc:
-                    print_stderr(f"Warning: Failed to fetch review body for {review_id}: {exc}")
-                    review_meta = None
+                # Also fetch body-embedded comments for CodeRabbit reviews, unless this
+                # review's body was already fetched and parsed with all PR reviews above
+                review_meta = None
+                if any(t.get("review_id") == int(review_id) for t in body_comment_threads):
+                    print_stderr(f"Body-embedded comments from review {review_id} already collected")
+                else:
+                    try:
+                        review_meta = fetch_review_body(owner, repo, pr_number, review_id)
+                    except (OSError, subprocess.SubprocessError, json.JSONDecodeError) as exc:
+                        print_stderr(f"Warning: Failed to fetch review body for {review_id}: {exc}")
                 if review_meta:
                     review_author = review_meta.get("user", {}).get("login") if review_meta.get("user") else None
                     if review_author in CODERABBIT_USERS:
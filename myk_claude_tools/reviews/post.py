@@ -38,15 +38,48 @@ from __future__ import annotations
 
 import json
 import os
+import random
 import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
+from collections import Counter
 from datetime import datetime, timezone
+from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from myk_claude_tools.reviews.fetch import get_thread_key
+
+# Memoized node_id -> thread_id lookups (None records a failed lookup) for the current run
+_thread_id_cache: dict[str, str | None] = {}
+
+# Bounded retry for transient GraphQL failures (exponential backoff with full jitter)
+_GRAPHQL_MAX_ATTEMPTS = 3
+_GRAPHQL_RETRY_BASE_DELAY = 0.25
+_RATE_LIMIT_MARKERS = ("rate limit", "rate_limited", "abuse detection")
+_SERVER_ERROR_MARKERS = ("http 500", "http 502", "http 503", "http 504")
+
+
+class Outcome(str, Enum):
+    """Per-thread result tallied for the run summary.
+
+    Body comment outcomes share their value with the comment ``type`` field.
+    """
+
+    ADDRESSED = "addressed"
+    SKIPPED = "skipped"
+    PENDING = "pending"
+    FAILED = "failed"
+    NO_THREAD_ID = "no_thread_id"
+    REPLIED_NOT_RESOLVED = "replied_not_resolved"
+    ALREADY_POSTED = "already_posted"
+    OUTSIDE_DIFF = "outside_diff_comment"
+    NITPICK = "nitpick_comment"
+    DUPLICATE = "duplicate_comment"
+
 
 def eprint(*args: Any, **kwargs: Any) -> None:
     """Print to stderr."""
@@ -61,38 +94,96 @@ def check_dependencies() -> None:
             sys.exit(1)
 
 
+def _truncate_utf8(text: str, max_bytes: int, suffix: str = "\n...[truncated]") -> str:
+    """Truncate text so its UTF-8 encoding (suffix included) fits in max_bytes.
+
+    GitHub enforces comment size limits in bytes, so multi-byte characters must
+    be counted by their encoded size. The text is encoded at most once and cut
+    on a character boundary.
+    """
+    # Every character encodes to at most 4 bytes, so short text needs no encoding
+    if len(text) * 4 <= max_bytes:
+        return text
+
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+
+    keep = max(0, max_bytes - len(suffix.encode("utf-8")))
+    return encoded[:keep].decode("utf-8", "ignore") + suffix
+
+
+def _combined_output(stdout: bytes, stderr: bytes) -> str:
+    """Decode and combine subprocess stdout/stderr for error reporting."""
+    output = stdout.decode("utf-8", "replace")
+    if stderr:
+        output += "\n" + stderr.decode("utf-8", "replace")
+    return output.strip()
+
+
+def _is_transient_graphql_error(error: str, is_mutation: bool) -> bool:
+    """Check whether a failed GraphQL call is worth retrying.
+
+    Rate-limit rejections are always retried. Server errors (5xx) are only
+    retried for queries: a mutation may have been applied before the error
+    was returned, and retrying it could post a duplicate reply.
+    """
+    lowered = error.lower()
+    if any(marker in lowered for marker in _RATE_LIMIT_MARKERS):
+        return True
+    return not is_mutation and any(marker in lowered for marker in _SERVER_ERROR_MARKERS)
+
+
 def run_graphql(query: str, variables: dict[str, str]) -> tuple[bool, dict[str, Any] | str]:
     """Run a GraphQL query via gh api graphql.
 
+    Transient failures are retried up to _GRAPHQL_MAX_ATTEMPTS times with
+    exponential backoff and jitter; other failures are returned immediately.
+
     Returns (success, result) where result is parsed JSON on success or error string on failure.
     """
-    payload = {"query": query, "variables": variables}
+    payload = json.dumps({"query": query, "variables": variables}).encode("utf-8")
+    is_mutation = query.lstrip().startswith("mutation")
+
+    for attempt in range(_GRAPHQL_MAX_ATTEMPTS):
+        success, result = _run_graphql_once(payload)
+        if success or attempt == _GRAPHQL_MAX_ATTEMPTS - 1:
+            break
+        if not _is_transient_graphql_error(str(result), is_mutation):
+            break
+        delay = _GRAPHQL_RETRY_BASE_DELAY * 2**attempt + random.uniform(0, _GRAPHQL_RETRY_BASE_DELAY)
+        eprint(f"Transient GraphQL error, retrying in {delay:.2f}s: {result}")
+        time.sleep(delay)
+
+    return success, result
+
+
+def _run_graphql_once(payload: bytes) -> tuple[bool, dict[str, Any] | str]:
+    """Run a single gh api graphql call with an already-encoded JSON payload."""
     cmd = ["gh", "api", "graphql", "--input", "-"]
 
     try:
+        # Binary mode: json.loads() decodes UTF-8 bytes itself, so stdout is only
+        # decoded to str when building an error message
         result = subprocess.run(
             cmd,
-            input=json.dumps(payload),
+            input=payload,
             capture_output=True,
-            text=True,
             timeout=120,
         )
     except subprocess.TimeoutExpired:
         return False, "GraphQL query timed out after 120 seconds"
 
-    # Use stdout for JSON parsing, combined output for error reporting
-    stdout = result.stdout or ""
-    stderr = result.stderr or ""
-    error_output = (stdout + ("\n" + stderr if stderr else "")).strip()
+    stdout = result.stdout or b""
 
     if result.returncode != 0:
-        return False, error_output
+        return False, _combined_output(stdout, result.stderr or b"")
 
     # Validate JSON response - parse stdout only
     try:
         data = json.loads(stdout)
-    except json.JSONDecodeError:
-        return False, error_output
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return False, _combined_output(stdout, result.stderr or b"")
 
     # Check for GraphQL errors
     if data.get("errors") and len(data["errors"]) > 0:
@@ -108,9 +199,7 @@ def post_thread_reply(thread_id: str, body: str) -> bool:
     Returns True on success, False on failure.
     """
     # GitHub comment bodies have a size limit (~65KB); truncate to avoid failures
-    max_len = 60000
-    if len(body) > max_len:
-        body = body[:max_len] + "\n...[truncated]"
+    body = _truncate_utf8(body, 60000)
 
     query = """
     mutation($threadId: ID!, $body: String!) {
@@ -157,8 +246,21 @@ def resolve_thread(thread_id: str) -> bool:
 def lookup_thread_id_from_node_id(node_id: str) -> str | None:
     """Look up thread_id from a review comment node_id via GraphQL.
 
+    Results (including failures) are memoized per process so repeated
+    node_ids do not trigger duplicate GraphQL round-trips.
+
     Returns thread_id on success, None on failure.
     """
+    if node_id in _thread_id_cache:
+        return _thread_id_cache[node_id]
+
+    thread_id = _lookup_thread_id(node_id)
+    _thread_id_cache[node_id] = thread_id
+    return thread_id
+
+
+def _lookup_thread_id(node_id: str) -> str | None:
+    """Run the uncached GraphQL lookup for lookup_thread_id_from_node_id()."""
     query = """
     query($nodeId: ID!) {
       node(id: $nodeId) {
@@ -186,6 +288,47 @@ def lookup_thread_id_from_node_id(node_id: str) -> str | None:
         return None
 
 
+def prefetch_thread_ids(node_ids: list[str], batch_size: int = 50) -> None:
+    """Resolve many node_ids to thread_ids with batched GraphQL queries.
+
+    Each batch is a single aliased query, so one `gh` process serves up to
+    batch_size lookups instead of one process per node_id. Results are stored
+    in the lookup cache used by lookup_thread_id_from_node_id(). A failed batch
+    is left uncached so the per-node lookup still runs as a fallback.
+
+    Args:
+        node_ids: Review comment node IDs to resolve.
+        batch_size: Maximum number of node lookups per GraphQL query.
+    """
+    pending = [node_id for node_id in dict.fromkeys(node_ids) if node_id not in _thread_id_cache]
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        params = ", ".join(f"$n{i}: ID!" for i in range(len(batch)))
+        fields = "\n".join(
+            f"n{i}: node(id: $n{i}) {{ ... on PullRequestReviewComment {{ pullRequestReviewThread {{ id }} }} }}"
+            for i in range(len(batch))
+        )
+        query = f"query({params}) {{\n{fields}\n}}"
+
+        success, result = run_graphql(query, {f"n{i}": node_id for i, node_id in enumerate(batch)})
+        if not success or not isinstance(result, dict) or not isinstance(result.get("data"), dict):
+            continue
+
+        for i, node_id in enumerate(batch):
+            try:
+                thread_id = result["data"][f"n{i}"]["pullRequestReviewThread"]["id"]
+            except (KeyError, TypeError):
+                thread_id = None
+            _thread_id_cache[node_id] = thread_id if thread_id else None
+
+
+def _normalize_id(value: Any) -> str:
+    """Normalize a thread/node ID field, mapping None, "" and "null" to ""."""
+    if not value or value == "null":
+        return ""
+    return str(value)
+
+
 def get_utc_timestamp() -> str:
     """Get current UTC timestamp in ISO format."""
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -218,6 +361,17 @@ def apply_updates_to_json(json_path: Path, updates: list[dict[str, Any]]) -> Non
             eprint(f"Warning: category '{cat}' not found in JSON, skipping update")
             continue
 
+        # Logged updates name the entry they were written for; if the JSON was re-fetched
+        # since, that entry may sit at another index (or be gone), so follow the key
+        if "key" in update and isinstance(data[cat], list):
+            key = update["key"]
+            if not (0 <= idx < len(data[cat]) and get_thread_key(data[cat][idx]) == key):
+                matches = [j for j, item in enumerate(data[cat]) if key and get_thread_key(item) == key]
+                if not matches:
+                    eprint(f"Warning: entry {key!r} for {cat}[{idx}] not found in JSON, skipping update")
+                    continue
+                idx = matches[0]
+
         # Validate index is valid
         if not isinstance(data[cat], list) or idx < 0 or idx >= len(data[cat]):
             eprint(f"Warning: invalid index {idx} for category '{cat}', skipping update")
@@ -251,17 +405,44 @@ def apply_updates_to_json(json_path: Path, updates: list[dict[str, Any]]) -> Non
         sys.exit(1)
 
 
+def _append_update_log(log_path: Path, update: dict[str, Any]) -> None:
+    """Durably append a single update to the JSONL write-ahead log."""
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(update) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_update_log(log_path: Path) -> list[dict[str, Any]]:
+    """Read updates from the write-ahead log, keeping the last one per (cat, idx, field).
+
+    A truncated final line (e.g. from a crash mid-write) is ignored.
+    """
+    if not log_path.is_file():
+        return []
+
+    updates_by_key: dict[tuple[Any, Any, Any], dict[str, Any]] = {}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                update = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(update, dict):
+                updates_by_key[update.get("cat"), update.get("idx"), update.get("field")] = update
+    return list(updates_by_key.values())
+
+
 def _build_comment_section(entry: dict[str, Any], max_section_len: int) -> str:
     """Build a formatted markdown section for a single body comment entry.
 
     Args:
         entry: Entry dict with {"data": thread_data, "cat": category, "idx": index}
-        max_section_len: Maximum allowed length for the section text.
+        max_section_len: Maximum allowed UTF-8 byte length for the section text.
 
     Returns:
         Formatted section text.
     """
-    truncated_suffix = "\n...[truncated]"
     comment = entry["data"]
     path = comment.get("path", "unknown")
     line_num = comment.get("line", "")
@@ -270,7 +451,7 @@ def _build_comment_section(entry: dict[str, Any], max_section_len: int) -> str:
     comment_type = comment.get("type", "").replace("_", " ").replace("comment", "").strip()
 
     body = comment.get("body", "")
-    summary = body.split("\n")[0][:100] if body else "No description"
+    summary = body.split("\n", 1)[0][:100] if body else "No description"
     summary = summary.strip("*").strip()
 
     location = f"`{path}:{line_num}`" if line_num else f"`{path}`"
@@ -287,12 +468,7 @@ def _build_comment_section(entry: dict[str, Any], max_section_len: int) -> str:
         section_lines.append(f"> Retry: {reply}" if reply else "> Retry.")
     section_lines.append("")
 
-    section_text = "\n".join(section_lines)
-    if len(section_text) > max_section_len:
-        keep = max(0, max_section_len - len(truncated_suffix))
-        section_text = section_text[:keep] + truncated_suffix
-
-    return section_text
+    return _truncate_utf8("\n".join(section_lines), max_section_len)
 
 
 def _chunk_sections(
@@ -302,24 +478,28 @@ def _chunk_sections(
 ) -> list[list[tuple[str, dict[str, Any]]]]:
     """Split sections into chunks that fit within the GitHub comment size limit.
 
+    Sizes are measured in UTF-8 bytes, the unit GitHub enforces, so a chunk of
+    multi-byte text never has to be cut after packing.
+
     Args:
         header: Comment header text (included in each chunk's size budget).
         sections: List of (section_text, entry) tuples.
-        max_len: Maximum allowed body length per chunk.
+        max_len: Maximum allowed body length per chunk, in UTF-8 bytes.
 
     Returns:
         List of chunks, where each chunk is a list of (section_text, entry) tuples.
     """
     chunks: list[list[tuple[str, dict[str, Any]]]] = []
     current_chunk: list[tuple[str, dict[str, Any]]] = []
-    current_size = len(header)
+    header_size = len(header.encode("utf-8"))
+    current_size = header_size
 
     for section_text, entry in sections:
-        section_size = len(section_text)
+        section_size = len(section_text.encode("utf-8"))
         if current_chunk and current_size + section_size > max_len:
             chunks.append(current_chunk)
             current_chunk = []
-            current_size = len(header)
+            current_size = header_size
         current_chunk.append((section_text, entry))
         current_size += section_size
 
@@ -351,19 +531,16 @@ def _post_chunk(
         header: Comment header text.
         chunk_idx: Zero-based index of this chunk.
         total_chunks: Total number of chunks being posted.
-        max_len: Maximum allowed body length.
+        max_len: Maximum allowed body length, in UTF-8 bytes.
 
     Returns:
         Tuple of (success, list of posted_at update dicts).
     """
-    truncated_suffix = "\n...[truncated]"
     chunk_body = header + "".join(text for text, _ in chunk).strip()
     if total_chunks > 1:
         chunk_body = f"(Part {chunk_idx + 1}/{total_chunks})\n\n" + chunk_body
 
-    if len(chunk_body) > max_len:
-        keep = max(0, max_len - len(truncated_suffix))
-        chunk_body = chunk_body[:keep] + truncated_suffix
+    chunk_body = _truncate_utf8(chunk_body, max_len)
 
     posted_updates: list[dict[str, Any]] = []
     try:
@@ -382,6 +559,7 @@ def _post_chunk(
                 posted_updates.append({
                     "cat": entry["cat"],
                     "idx": entry["idx"],
+                    "key": get_thread_key(entry["data"]),
                     "field": "posted_at",
                     "ts": ts,
                 })
@@ -426,7 +604,7 @@ def post_body_comment_replies(
 
         header = header_template.format(reviewer=reviewer)
         part_prefix_budget = 32  # "(Part N/M)\n\n" safety margin
-        max_section_len = max_len - len(header) - part_prefix_budget
+        max_section_len = max_len - len(header.encode("utf-8")) - part_prefix_budget
 
         # Build individual sections for each comment
         sections: list[tuple[str, dict[str, Any]]] = []
@@ -434,8 +612,8 @@ def post_body_comment_replies(
             section_text = _build_comment_section(entry, max_section_len)
             sections.append((section_text, entry))
 
-        # Chunk sections into posts that fit within the size limit
-        chunks = _chunk_sections(header, sections, max_len)
+        # Chunk sections into posts that fit within the size limit, leaving room for the part prefix
+        chunks = _chunk_sections(header, sections, max_len - part_prefix_budget)
 
         # Post each chunk
         for chunk_idx, chunk in enumerate(chunks):
@@ -472,6 +650,17 @@ def run(json_path: str) -> None:
         eprint(f"Error: Invalid JSON file: {json_path}")
         sys.exit(1)
 
+    # Updates are appended to a write-ahead log as they happen, so an interrupted
+    # run does not lose track of replies that were already posted
+    update_log_path = json_path_obj.with_suffix(".updates.jsonl")
+    recovered_updates = _read_update_log(update_log_path)
+    if recovered_updates:
+        eprint(f"Recovering {len(recovered_updates)} update(s) from interrupted run...")
+        apply_updates_to_json(json_path_obj, recovered_updates)
+        update_log_path.unlink()
+        with open(json_path_obj, encoding="utf-8") as f:
+            data = json.load(f)
+
     # Extract metadata
     metadata = data.get("metadata", {})
     owner = metadata.get("owner", "")
@@ -496,24 +685,27 @@ def run(json_path: str) -> None:
 
     eprint(f"Processing {total_thread_count} threads sequentially...")
 
-    # Counters for summary
-    addressed_count = 0
-    skipped_count = 0
-    pending_count = 0
-    failed_count = 0
-    no_thread_id_count = 0
-    replied_not_resolved_count = 0
-    already_posted_count = 0
-    outside_diff_count = 0
-    nitpick_count = 0
-    duplicate_count = 0
+    # Resolve all node_id-only threads up front in batched queries
+    body_comment_types = ("outside_diff_comment", "nitpick_comment", "duplicate_comment")
+    prefetch_node_ids = [
+        _normalize_id(thread_data["node_id"])
+        for category in categories
+        for thread_data in data.get(category, [])
+        if _normalize_id(thread_data.get("node_id"))
+        and not _normalize_id(thread_data.get("thread_id"))
+        and thread_data.get("type") not in body_comment_types
+        and (thread_data.get("status") or "pending") != "pending"
+        and not thread_data.get("posted_at")
+    ]
+    if prefetch_node_ids:
+        prefetch_thread_ids(prefetch_node_ids)
+
+    # Outcome counters for summary, keyed by outcome name (body comments by comment type)
+    counts: Counter[Outcome] = Counter()
 
     # Collect body comments for consolidated PR comments
     body_comments_by_reviewer: dict[str, list[dict[str, Any]]] = {}
 
-    # Track updates for atomic application
-    updates: list[dict[str, Any]] = []
-
     # Process each category
     for category in categories:
         category_threads = data.get(category, [])
@@ -526,8 +718,8 @@ def run(json_path: str) -> None:
 
         for i, thread_data in enumerate(category_threads):
             # Extract fields
-            thread_id = thread_data.get("thread_id", "") or ""
-            node_id = thread_data.get("node_id", "") or ""
+            thread_id = _normalize_id(thread_data.get("thread_id"))
+            node_id = _normalize_id(thread_data.get("node_id"))
             status = thread_data.get("status", "pending") or "pending"
             reply = thread_data.get("reply", "") or ""
             skip_reason = thread_data.get("skip_reason", "") or ""
@@ -538,21 +730,21 @@ def run(json_path: str) -> None:
             # Outside-diff and nitpick comments have no GitHub thread to post to or resolve.
             # They are tracked via the review database only.
             comment_type = thread_data.get("type")
-            if comment_type in ("outside_diff_comment", "nitpick_comment", "duplicate_comment"):
+            if comment_type in body_comment_types:
                 if status == "pending":
-                    pending_count += 1
+                    counts[Outcome.PENDING] += 1
                     eprint(f"Skipping {category}[{i}] ({path}): {comment_type} status is pending")
                     continue
                 if status in ("addressed", "not_addressed", "skipped", "failed"):
                     # Skip if already posted (idempotency)
                     if posted_at:
-                        already_posted_count += 1
+                        counts[Outcome.ALREADY_POSTED] += 1
                         eprint(f"Skipping {category}[{i}] ({path}): {comment_type} already posted at {posted_at}")
                         continue
 
                     # Skip auto-skipped entries — they were already replied to in a previous cycle
                     if thread_data.get("is_auto_skipped"):
-                        already_posted_count += 1
+                        counts[Outcome.ALREADY_POSTED] += 1
                         eprint(
                             f"Skipping {category}[{i}] ({path}): {comment_type}"
                             " auto-skipped (already replied in previous cycle)"
@@ -587,7 +779,7 @@ def run(json_path: str) -> None:
                     resolve_only_retry = True
                     eprint(f"Retrying resolve for {category}[{i}] ({path}): posted at {posted_at} but not resolved")
                 else:
-                    already_posted_count += 1
+                    counts[Outcome.ALREADY_POSTED] += 1
                     eprint(
                         f"Skipping {category}[{i}] ({path}): reply already posted at "
                         f"{posted_at} (not resolving by policy)"
@@ -595,21 +787,21 @@ def run(json_path: str) -> None:
                     continue
             elif posted_at:
                 # Already fully processed (posted and resolved)
-                already_posted_count += 1
+                counts[Outcome.ALREADY_POSTED] += 1
                 eprint(f"Skipping {category}[{i}] ({path}): already posted at {posted_at}")
                 continue
 
             # Skip pending threads
             if status == "pending":
-                pending_count += 1
+                counts[Outcome.PENDING] += 1
                 eprint(f"Skipping {category}[{i}] ({path}): status is pending")
                 continue
 
             # Determine which ID to use for GraphQL
             effective_thread_id = ""
-            if thread_id and thread_id != "null":
+            if thread_id:
                 effective_thread_id = thread_id
-            elif node_id and node_id != "null":
+            elif node_id:
                 # Try to derive thread_id from the review comment node id
                 looked_up_id = lookup_thread_id_from_node_id(node_id)
                 if looked_up_id is None:
@@ -619,7 +811,7 @@ def run(json_path: str) -> None:
 
             # Check if we have a usable thread ID
             if not effective_thread_id:
-                no_thread_id_count += 1
+                counts[Outcome.NO_THREAD_ID] += 1
                 eprint(f"Warning: No resolvable thread_id for {category}[{i}] ({path}) - cannot post reply")
                 continue
 
@@ -642,43 +834,50 @@ def run(json_path: str) -> None:
                 eprint(f"Warning: Unknown status for {category}[{i}] ({path}): {status}")
                 continue
 
-            # Post reply only if not already posted
+            # Post reply only if not already posted; log posted_at right away so an
+            # interrupted run retries only the resolve
             if not resolve_only_retry:
                 if not post_thread_reply(effective_thread_id, reply_message):
-                    failed_count += 1
+                    counts[Outcome.FAILED] += 1
                     eprint(f"Failed to post reply for {category}[{i}] ({path})")
                     continue
+                _append_update_log(
+                    update_log_path,
+                    {
+                        "cat": category,
+                        "idx": i,
+                        "key": get_thread_key(thread_data),
+                        "field": "posted_at",
+                        "ts": get_utc_timestamp(),
+                    },
+                )
 
             # Resolve thread only if appropriate
             if should_resolve:
                 if not resolve_thread(effective_thread_id):
-                    # Record posted_at if we just posted (so next run can retry resolve only)
-                    if not resolve_only_retry:
-                        posted_at_timestamp = get_utc_timestamp()
-                        updates.append({"cat": category, "idx": i, "field": "posted_at", "ts": posted_at_timestamp})
-                    failed_count += 1
+                    counts[Outcome.FAILED] += 1
                     eprint(f"Failed to resolve {category}[{i}] ({path}) - reply was posted but thread not resolved")
                     continue
 
-                # Record both timestamps after successful resolve
-                if not resolve_only_retry:
-                    posted_at_timestamp = get_utc_timestamp()
-                    updates.append({"cat": category, "idx": i, "field": "posted_at", "ts": posted_at_timestamp})
-                resolved_at_timestamp = get_utc_timestamp()
-                updates.append({"cat": category, "idx": i, "field": "resolved_at", "ts": resolved_at_timestamp})
+                _append_update_log(
+                    update_log_path,
+                    {
+                        "cat": category,
+                        "idx": i,
+                        "key": get_thread_key(thread_data),
+                        "field": "resolved_at",
+                        "ts": get_utc_timestamp(),
+                    },
+                )
 
                 if status in ("addressed", "not_addressed", "failed"):
-                    addressed_count += 1
+                    counts[Outcome.ADDRESSED] += 1
                 elif status == "skipped":
-                    skipped_count += 1
+                    counts[Outcome.SKIPPED] += 1
 
                 eprint(f"Resolved {category}[{i}] ({path})")
             else:
-                # For threads we don't resolve, record posted_at after successful reply
-                if not resolve_only_retry:
-                    posted_at_timestamp = get_utc_timestamp()
-                    updates.append({"cat": category, "idx": i, "field": "posted_at", "ts": posted_at_timestamp})
-                replied_not_resolved_count += 1
+                counts[Outcome.REPLIED_NOT_RESOLVED] += 1
                 eprint(f"Replied to {category}[{i}] ({path}) (not resolved)")
 
     # Post consolidated PR comments for body comments
@@ -686,7 +885,8 @@ def run(json_path: str) -> None:
         total_body = sum(len(c) for c in body_comments_by_reviewer.values())
         eprint(f"\nPosting consolidated replies for {total_body} body comment(s)...")
         _, body_updates = post_body_comment_replies(owner, repo, pr_number, body_comments_by_reviewer)
-        updates.extend(body_updates)
+        for update in body_updates:
+            _append_update_log(update_log_path, update)
 
         # Count successfully posted body comments by type
         for update in body_updates:
@@ -694,52 +894,56 @@ def run(json_path: str) -> None:
             idx = update["idx"]
             comment_data = data.get(cat, [])[idx] if idx < len(data.get(cat, [])) else {}
             comment_type = comment_data.get("type", "")
-            if comment_type == "outside_diff_comment":
-                outside_diff_count += 1
-            elif comment_type == "nitpick_comment":
-                nitpick_count += 1
-            elif comment_type == "duplicate_comment":
-                duplicate_count += 1
+            if comment_type in body_comment_types:
+                counts[Outcome(comment_type)] += 1
 
         body_comment_failed = total_body - len(body_updates)
         if body_comment_failed > 0:
-            failed_count += body_comment_failed
+            counts[Outcome.FAILED] += body_comment_failed
 
-    # Apply all JSON updates atomically
-    apply_updates_to_json(json_path_obj, updates)
+    # Apply all logged updates atomically, then discard the log
+    apply_updates_to_json(json_path_obj, _read_update_log(update_log_path))
+    update_log_path.unlink(missing_ok=True)
 
     # Print summary
-    total_resolved = addressed_count + skipped_count
-    total_processed = total_resolved + replied_not_resolved_count + outside_diff_count + nitpick_count + duplicate_count
+    total_resolved = counts[Outcome.ADDRESSED] + counts[Outcome.SKIPPED]
+    total_processed = (
+        total_resolved
+        + counts[Outcome.REPLIED_NOT_RESOLVED]
+        + counts[Outcome.OUTSIDE_DIFF]
+        + counts[Outcome.NITPICK]
+        + counts[Outcome.DUPLICATE]
+    )
     eprint("")
     eprint("=== Summary ===")
     eprint(f"Processed {total_processed} threads")
-    eprint(f"  Resolved: {total_resolved} ({addressed_count} addressed, {skipped_count} skipped)")
+    eprint(f"  Resolved: {total_resolved} ({counts[Outcome.ADDRESSED]} addressed, {counts[Outcome.SKIPPED]} skipped)")
 
-    if replied_not_resolved_count > 0:
-        eprint(f"  Replied only: {replied_not_resolved_count} (human reviews - awaiting reviewer follow-up)")
+    if counts[Outcome.REPLIED_NOT_RESOLVED] > 0:
+        eprint(f"  Replied only: {counts[Outcome.REPLIED_NOT_RESOLVED]} (human reviews - awaiting reviewer follow-up)")
 
-    if outside_diff_count > 0:
-        eprint(f"  Outside-diff: {outside_diff_count} (replied via consolidated PR comment)")
+    if counts[Outcome.OUTSIDE_DIFF] > 0:
+        eprint(f"  Outside-diff: {counts[Outcome.OUTSIDE_DIFF]} (replied via consolidated PR comment)")
 
-    if nitpick_count > 0:
-        eprint(f"  Nitpick: {nitpick_count} (replied via consolidated PR comment)")
+    if counts[Outcome.NITPICK] > 0:
+        eprint(f"  Nitpick: {counts[Outcome.NITPICK]} (replied via consolidated PR comment)")
 
-    if duplicate_count > 0:
-        eprint(f"  Duplicate: {duplicate_count} (replied via consolidated PR comment)")
+    if counts[Outcome.DUPLICATE] > 0:
+        eprint(f"  Duplicate: {counts[Outcome.DUPLICATE]} (replied via consolidated PR comment)")
 
-    if pending_count > 0:
-        eprint(f"  Pending: {pending_count} threads (not processed yet)")
+    if counts[Outcome.PENDING] > 0:
+        eprint(f"  Pending: {counts[Outcome.PENDING]} threads (not processed yet)")
 
-    if no_thread_id_count > 0:
+    if counts[Outcome.NO_THREAD_ID] > 0:
         eprint(
-            f"  Skipped: {no_thread_id_count} threads "
+            f"  Skipped: {counts[Outcome.NO_THREAD_ID]} threads "
             "(no thread_id - likely fetched via REST API without GraphQL thread ID)"
         )
 
-    if already_posted_count > 0:
-        eprint(f"  Already posted: {already_posted_count} threads")
+    if counts[Outcome.ALREADY_POSTED] > 0:
+        eprint(f"  Already posted: {counts[Outcome.ALREADY_POSTED]} threads")
 
+    failed_count = counts[Outcome.FAILED]
     if failed_count > 0:
         eprint(f"Failed: {failed_count} threads")
         # Print actionable retry instruction to stdout for AI callers
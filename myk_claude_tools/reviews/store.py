@@ -52,25 +52,63 @@ CREATE INDEX IF NOT EXISTS idx_reviews_pr ON reviews(owner, repo, pr_number);
 CREATE INDEX IF NOT EXISTS idx_reviews_commit ON reviews(commit_sha);
 """
 
+# Comment fields copied from the review JSON, in column order after review_id and source
+_COMMENT_FIELDS = (
+    "thread_id",
+    "node_id",
+    "comment_id",
+    "author",
+    "path",
+    "line",
+    "body",
+    "priority",
+    "status",
+    "reply",
+    "skip_reason",
+    "posted_at",
+    "resolved_at",
+    "type",
+)
+
+# Built once so every batch reuses the same statement text (and SQLite's cached prepared statement)
+_INSERT_COMMENT_SQL = (
+    f"INSERT INTO comments (review_id, source, {', '.join(_COMMENT_FIELDS)}) "
+    f"VALUES ({', '.join('?' * (len(_COMMENT_FIELDS) + 2))})"
+)
+
 
 def log(message: str) -> None:
     """Print message to stderr."""
     print(message, file=sys.stderr)
 
 
+# HEAD SHAs captured by get_project_root(), keyed by project root, so that
+# get_current_commit_sha() does not need a second git process for the same repo.
+_head_sha_cache: dict[Path, str] = {}
+
+
 def get_project_root() -> Path:
-    """Detect project root using git rev-parse --show-toplevel."""
+    """Detect project root using git rev-parse --show-toplevel.
+
+    HEAD is resolved in the same git call and remembered for
+    get_current_commit_sha(). In a repository without commits only the
+    toplevel is printed.
+    """
     try:
         result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
+            ["git", "rev-parse", "--show-toplevel", "--verify", "-q", "HEAD"],
             capture_output=True,
             text=True,
             timeout=5,
         )
-        if result.returncode != 0:
+        lines = result.stdout.strip().splitlines()
+        if result.returncode != 0 and not lines:
             log(f"Error: git rev-parse failed: {result.stderr.strip()}")
             sys.exit(1)
-        return Path(result.stdout.strip())
+        project_root = Path(lines[0].strip())
+        if result.returncode == 0 and len(lines) > 1 and lines[1].strip():
+            _head_sha_cache[project_root] = lines[1].strip()
+        return project_root
     except subprocess.TimeoutExpired:
         log("Error: git command timed out")
         sys.exit(1)
@@ -110,6 +148,8 @@ def get_current_commit_sha(cwd: Path | None = None) -> str:
     Args:
         cwd: Working directory for git command. If None, uses current directory.
     """
+    if cwd is not None and cwd in _head_sha_cache:
+        return _head_sha_cache[cwd]
     try:
         result = subprocess.run(
             ["git", "rev-parse", "HEAD"],
@@ -133,49 +173,32 @@ def get_current_commit_sha(cwd: Path | None = None) -> str:
 
 def insert_review(conn: sqlite3.Connection, owner: str, repo: str, pr_number: int, commit_sha: str) -> int:
     """Insert a new review record. Always appends, never updates."""
-    cursor = conn.cursor()
     created_at = datetime.now(timezone.utc).isoformat()
 
-    cursor.execute(
+    review_id = conn.execute(
         "INSERT INTO reviews (owner, repo, pr_number, commit_sha, created_at) VALUES (?, ?, ?, ?, ?)",
         (owner, repo, pr_number, commit_sha, created_at),
-    )
-    review_id = cursor.lastrowid
+    ).lastrowid
     if not review_id:
         raise RuntimeError("Failed to insert review record")
-    return int(review_id)
+    return review_id
 
 
 def insert_comment(conn: sqlite3.Connection, review_id: int, source: str, comment: dict[str, Any]) -> None:
     """Insert a single comment record."""
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO comments (
-            review_id, source, thread_id, node_id, comment_id, author,
-            path, line, body, priority, status, reply, skip_reason,
-            posted_at, resolved_at, type
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            review_id,
-            source,
-            comment.get("thread_id"),
-            comment.get("node_id"),
-            comment.get("comment_id"),
-            comment.get("author"),
-            comment.get("path"),
-            comment.get("line"),
-            comment.get("body"),
-            comment.get("priority"),
-            comment.get("status"),
-            comment.get("reply"),
-            comment.get("skip_reason"),
-            comment.get("posted_at"),
-            comment.get("resolved_at"),
-            comment.get("type"),
-        ),
-    )
+    insert_comments(conn, review_id, source, [comment])
+
+
+def insert_comments(conn: sqlite3.Connection, review_id: int, source: str, comments: list[dict[str, Any]]) -> int:
+    """Insert comment records for one source in a single executemany() batch.
+
+    Returns:
+        Number of comments inserted.
+    """
+    # map(comment.get, ...) fetches every field with one bound method instead of a lookup per column
+    rows = [(review_id, source, *map(comment.get, _COMMENT_FIELDS)) for comment in comments]
+    conn.executemany(_INSERT_COMMENT_SQL, rows)
+    return len(rows)
 
 
 def store_reviews(json_path: Path) -> None:
@@ -183,8 +206,8 @@ def store_reviews(json_path: Path) -> None:
     # Read JSON file
     log(f"Reading JSON file: {json_path}")
     try:
-        with open(json_path, encoding="utf-8") as f:
-            data = json.load(f)
+        # Parse the raw bytes directly, skipping the text-mode file wrapper
+        data = json.loads(json_path.read_bytes())
     except FileNotFoundError:
         log(f"Error: JSON file not found: {json_path}")
         sys.exit(1)
@@ -223,6 +246,10 @@ def store_reviews(json_path: Path) -> None:
     try:
         # Enable foreign key constraints for referential integrity
         conn.execute("PRAGMA foreign_keys=ON")
+        # WAL lets readers (e.g. `myk-claude-tools db`) proceed during the write,
+        # and synchronous=NORMAL skips the per-commit fsync that WAL makes safe to drop
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
         create_tables(conn)
 
         # Insert new review record (append-only, never update)
@@ -234,10 +261,7 @@ def store_reviews(json_path: Path) -> None:
 
         # Insert comments from each source
         for source in ["human", "qodo", "coderabbit"]:
-            comments = data.get(source, [])
-            for comment in comments:
-                insert_comment(conn, review_id, source, comment)
-                counts[source] += 1
+            counts[source] += insert_comments(conn, review_id, source, data.get(source, []))
 
         # Commit transaction
         conn.commit()
@@ -28,7 +28,11 @@ def is_forbidden_precommit_command(command: str) -> bool:
 
 def main() -> None:
     try:
-        input_data = json.loads(sys.stdin.read())
+        raw_input = sys.stdin.buffer.read()
+        # Only Bash commands are checked; skip parsing TodoWrite payloads
+        if b'"Bash"' not in raw_input:
+            sys.exit(0)
+        input_data = json.loads(raw_input)
         tool_name = input_data.get("tool_name", "")
         tool_input = input_data.get("tool_input", {})
 
@@ -610,3 +610,11 @@ class TestParseReviewBodyComments:
         assert result["nitpick"] == []
         assert len(result["duplicate"]) == 1
         assert result["duplicate"][0]["path"] == "CLAUDE.md"
+
+    def test_many_unrelated_summaries_before_section(self) -> None:
+        """Unrelated <summary> tags should not stop the section from being found."""
+        noise = "<details><summary>Walkthrough notes</summary>\n" + "word " * 20 + "\n</details>\n"
+        body = noise * 200 + SAMPLE_BODY_TWO_COMMENTS
+        result = parse_review_body_comments(body)
+        assert len(result["outside_diff"]) == 2
+        assert result["nitpick"] == []
@@ -1704,6 +1704,46 @@ class TestRunReviewUrlBodyComments:
         mock_review_body.assert_called_once()
         mock_parse.assert_not_called()
 
+    @patch.object(get_all_reviews, "fetch_review_body")
+    @patch.object(get_all_reviews, "fetch_review_comments")
+    @patch.object(get_all_reviews, "fetch_coderabbit_body_comments")
+    @patch.object(get_all_reviews, "fetch_unresolved_threads")
+    @patch.object(get_all_reviews, "get_pr_info")
+    @patch.object(get_all_reviews, "check_dependencies")
+    def test_skips_review_body_already_parsed(
+        self,
+        _mock_check_deps: Any,
+        mock_pr_info: Any,
+        mock_threads: Any,
+        mock_body_comments: Any,
+        mock_review_comments: Any,
+        mock_review_body: Any,
+    ) -> None:
+        """Review body should not be re-fetched when its comments were already collected."""
+        mock_pr_info.return_value = ("owner", "repo", "1")
+        mock_threads.return_value = []
+        mock_body_comments.return_value = [
+            {
+                "thread_id": None,
+                "node_id": "PRR_abc",
+                "comment_id": None,
+                "author": "coderabbitai[bot]",
+                "path": "src/a.py",
+                "line": 10,
+                "body": "nit",
+                "type": "nitpick_comment",
+                "review_id": 12345,
+                "suggestion_index": 0,
+                "replies": [],
+            },
+        ]
+        mock_review_comments.return_value = []
+
+        result = get_all_reviews.run("https://github.com/owner/repo/pull/1#pullrequestreview-12345")
+
+        assert result == 0
+        mock_review_body.assert_not_called()
+
     @patch.object(get_all_reviews, "fetch_review_body")
     @patch.object(get_all_reviews, "fetch_review_comments")
     @patch.object(get_all_reviews, "fetch_coderabbit_body_comments")
@@ -19,6 +19,13 @@ import pytest
 
 from myk_claude_tools.reviews import post as post_review_replies
 
+
+@pytest.fixture(autouse=True)
+def _clear_thread_id_cache() -> None:
+    """Reset the memoized node_id lookups between tests."""
+    post_review_replies._thread_id_cache.clear()
+
+
 # =============================================================================
 # Tests for check_dependencies()
 # =============================================================================
@@ -59,7 +66,7 @@ class TestRunGraphql:
     @patch("subprocess.run")
     def test_successful_query(self, mock_run: Any) -> None:
         """Successful GraphQL query should return (True, data)."""
-        mock_run.return_value = MagicMock(returncode=0, stdout='{"data": {"test": "value"}}', stderr="")
+        mock_run.return_value = MagicMock(returncode=0, stdout=b'{"data": {"test": "value"}}', stderr=b"")
 
         success, result = post_review_replies.run_graphql("query { test }", {})
 
@@ -69,7 +76,7 @@ class TestRunGraphql:
     @patch("subprocess.run")
     def test_failed_query_returns_false(self, mock_run: Any) -> None:
         """Failed GraphQL query should return (False, error_string)."""
-        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="auth error")
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"", stderr=b"auth error")
 
         success, result = post_review_replies.run_graphql("query { test }", {})
 
@@ -79,7 +86,7 @@ class TestRunGraphql:
     @patch("subprocess.run")
     def test_invalid_json_response(self, mock_run: Any) -> None:
         """Invalid JSON response should return (False, error_string)."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="not valid json", stderr="")
+        mock_run.return_value = MagicMock(returncode=0, stdout=b"not valid json", stderr=b"")
 
         success, _ = post_review_replies.run_graphql("query { test }", {})
 
@@ -90,8 +97,8 @@ class TestRunGraphql:
         """GraphQL errors in response should return (False, error_message)."""
         mock_run.return_value = MagicMock(
             returncode=0,
-            stdout='{"errors": [{"message": "Field not found"}], "data": null}',
-            stderr="",
+            stdout=b'{"errors": [{"message": "Field not found"}], "data": null}',
+            stderr=b"",
         )
 
         success, result = post_review_replies.run_graphql("query { test }", {})
@@ -102,7 +109,7 @@ class TestRunGraphql:
     @patch("subprocess.run")
     def test_variables_passed_via_stdin(self, mock_run: Any) -> None:
         """Variables should be passed via stdin as JSON payload."""
-        mock_run.return_value = MagicMock(returncode=0, stdout='{"data": {}}', stderr="")
+        mock_run.return_value = MagicMock(returncode=0, stdout=b'{"data": {}}', stderr=b"")
 
         variables = {"key1": "value1", "key2": "value with spaces"}
         post_review_replies.run_graphql("query", variables)
@@ -111,6 +118,84 @@ class TestRunGraphql:
         call_args = mock_run.call_args[0][0]
         assert "--input" in call_args
         assert "-" in call_args
+        assert json.loads(mock_run.call_args.kwargs["input"]) == {"query": "query", "variables": variables}
+
+    @patch("subprocess.run")
+    def test_non_utf8_error_output_is_decoded(self, mock_run: Any) -> None:
+        """Undecodable error output should not raise."""
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"", stderr=b"bad \xff byte")
+
+        success, result = post_review_replies.run_graphql("query { test }", {})
+
+        assert success is False
+        assert "bad" in str(result)
+
+    @patch("time.sleep")
+    @patch("subprocess.run")
+    def test_retries_transient_query_error(self, mock_run: Any, mock_sleep: Any) -> None:
+        """Server errors on queries should be retried with backoff."""
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout=b"", stderr=b"HTTP 502: Bad Gateway"),
+            MagicMock(returncode=0, stdout=b'{"data": {"ok": true}}', stderr=b""),
+        ]
+
+        success, result = post_review_replies.run_graphql("query { ok }", {})
+
+        assert success is True
+        assert result == {"data": {"ok": True}}
+        assert mock_run.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @patch("time.sleep")
+    @patch("subprocess.run")
+    def test_gives_up_after_max_attempts(self, mock_run: Any, mock_sleep: Any) -> None:
+        """Persistent transient errors should fail after the bounded attempts."""
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"", stderr=b"HTTP 503: Service Unavailable")
+
+        success, _ = post_review_replies.run_graphql("query { ok }", {})
+
+        assert success is False
+        assert mock_run.call_count == post_review_replies._GRAPHQL_MAX_ATTEMPTS
+        assert mock_sleep.call_count == post_review_replies._GRAPHQL_MAX_ATTEMPTS - 1
+
+    @patch("time.sleep")
+    @patch("subprocess.run")
+    def test_mutation_not_retried_on_server_error(self, mock_run: Any, mock_sleep: Any) -> None:
+        """Mutations may have been applied, so server errors are not retried."""
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"", stderr=b"HTTP 502: Bad Gateway")
+
+        success, _ = post_review_replies.run_graphql("mutation { ok }", {})
+
+        assert success is False
+        assert mock_run.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("time.sleep")
+    @patch("subprocess.run")
+    def test_mutation_retried_on_rate_limit(self, mock_run: Any, mock_sleep: Any) -> None:
+        """Rate-limited mutations were rejected and are safe to retry."""
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout=b"", stderr=b"You have exceeded a secondary rate limit"),
+            MagicMock(returncode=0, stdout=b'{"data": {}}', stderr=b""),
+        ]
+
+        success, _ = post_review_replies.run_graphql("mutation { ok }", {})
+
+        assert success is True
+        assert mock_run.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @patch("time.sleep")
+    @patch("subprocess.run")
+    def test_validation_error_not_retried(self, mock_run: Any, mock_sleep: Any) -> None:
+        """Non-transient errors should fail immediately."""
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"", stderr=b"HTTP 422: Unprocessable Entity")
+
+        success, _ = post_review_replies.run_graphql("query { ok }", {})
+
+        assert success is False
+        assert mock_run.call_count == 1
+        mock_sleep.assert_not_called()
 
 
 # =============================================================================
@@ -154,6 +239,21 @@ class TestPostThreadReply:
         assert len(passed_body) <= 60000 + len("\n...[truncated]")
         assert passed_body.endswith("...[truncated]")
 
+    @patch.object(post_review_replies, "run_graphql")
+    def test_truncates_multibyte_body_by_bytes(self, mock_graphql: Any) -> None:
+        """Body size limit should be enforced on the UTF-8 byte length."""
+        mock_graphql.return_value = (True, {"data": {}})
+
+        # 40000 characters but 120000 bytes
+        long_body = "\u20ac" * 40000
+
+        post_review_replies.post_thread_reply("thread123", long_body)
+
+        passed_body = mock_graphql.call_args[0][1]["body"]
+        assert len(passed_body.encode("utf-8")) <= 60000
+        assert passed_body.endswith("...[truncated]")
+        assert passed_body.startswith("\u20ac")
+
 
 # =============================================================================
 # Tests for resolve_thread()
@@ -244,6 +344,77 @@ class TestLookupThreadIdFromNodeId:
 
         assert result is None
 
+    @patch.object(post_review_replies, "run_graphql")
+    def test_lookup_is_memoized(self, mock_graphql: Any) -> None:
+        """Repeated lookups for the same node_id should only query once."""
+        mock_graphql.return_value = (
+            True,
+            {"data": {"node": {"pullRequestReviewThread": {"id": "thread_abc"}}}},
+        )
+
+        first = post_review_replies.lookup_thread_id_from_node_id("node123")
+        second = post_review_replies.lookup_thread_id_from_node_id("node123")
+
+        assert first == second == "thread_abc"
+        mock_graphql.assert_called_once()
+
+    @patch.object(post_review_replies, "run_graphql")
+    def test_failed_lookup_is_memoized(self, mock_graphql: Any) -> None:
+        """Failed lookups should not be retried within the same run."""
+        mock_graphql.return_value = (False, "Error looking up")
+
+        assert post_review_replies.lookup_thread_id_from_node_id("node123") is None
+        assert post_review_replies.lookup_thread_id_from_node_id("node123") is None
+        mock_graphql.assert_called_once()
+
+
+# =============================================================================
+# Tests for prefetch_thread_ids()
+# =============================================================================
+
+
+class TestPrefetchThreadIds:
+    """Tests for prefetch_thread_ids() batched thread ID lookup."""
+
+    @patch.object(post_review_replies, "run_graphql")
+    def test_batches_lookups_into_one_query(self, mock_graphql: Any) -> None:
+        """All node_ids in a batch should be resolved by a single query."""
+        mock_graphql.return_value = (
+            True,
+            {
+                "data": {
+                    "n0": {"pullRequestReviewThread": {"id": "thread_a"}},
+                    "n1": None,
+                }
+            },
+        )
+
+        post_review_replies.prefetch_thread_ids(["node_a", "node_b", "node_a"])
+
+        mock_graphql.assert_called_once()
+        assert mock_graphql.call_args[0][1] == {"n0": "node_a", "n1": "node_b"}
+        assert post_review_replies.lookup_thread_id_from_node_id("node_a") == "thread_a"
+        assert post_review_replies.lookup_thread_id_from_node_id("node_b") is None
+        mock_graphql.assert_called_once()
+
+    @patch.object(post_review_replies, "run_graphql")
+    def test_respects_batch_size(self, mock_graphql: Any) -> None:
+        """Node IDs should be split into batches of batch_size."""
+        mock_graphql.return_value = (True, {"data": {}})
+
+        post_review_replies.prefetch_thread_ids(["a", "b", "c"], batch_size=2)
+
+        assert mock_graphql.call_count == 2
+
+    @patch.object(post_review_replies, "run_graphql")
+    def test_failed_batch_is_not_cached(self, mock_graphql: Any) -> None:
+        """A failed batch should leave node_ids for the per-node fallback."""
+        mock_graphql.return_value = (False, "Could not resolve to a node")
+
+        post_review_replies.prefetch_thread_ids(["node_a"])
+
+        assert "node_a" not in post_review_replies._thread_id_cache
+
 
 # =============================================================================
 # Tests for get_utc_timestamp()
@@ -325,6 +496,129 @@ class TestApplyUpdatesToJson:
         assert result["human"][1]["resolved_at"] == "2024-01-15T11:00:00Z"
 
 
+# =============================================================================
+# Tests for the update write-ahead log
+# =============================================================================
+
+
+class TestUpdateLog:
+    """Tests for the JSONL write-ahead log used to persist updates during run()."""
+
+    def test_read_dedups_and_skips_torn_lines(self, tmp_path: Path) -> None:
+        """Last update per (cat, idx, field) wins and a torn final line is ignored."""
+        log_path = tmp_path / "reviews.updates.jsonl"
+        post_review_replies._append_update_log(log_path, {"cat": "human", "idx": 0, "field": "posted_at", "ts": "a"})
+        post_review_replies._append_update_log(log_path, {"cat": "human", "idx": 0, "field": "posted_at", "ts": "b"})
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write('{"cat": "human", "idx": 1, "fie')
+
+        updates = post_review_replies._read_update_log(log_path)
+
+        assert updates == [{"cat": "human", "idx": 0, "field": "posted_at", "ts": "b"}]
+
+    def test_read_missing_log_returns_empty(self, tmp_path: Path) -> None:
+        """A missing log should yield no updates."""
+        assert post_review_replies._read_update_log(tmp_path / "missing.updates.jsonl") == []
+
+    @patch.object(post_review_replies, "resolve_thread")
+    @patch.object(post_review_replies, "post_thread_reply")
+    @patch.object(post_review_replies, "check_dependencies")
+    def test_run_applies_and_removes_log(
+        self, mock_deps: Any, mock_post: Any, mock_resolve: Any, tmp_path: Path
+    ) -> None:
+        """A completed run should write timestamps to the JSON and delete the log."""
+        del mock_deps  # Injected by @patch decorator, unused in test
+        mock_post.return_value = True
+        mock_resolve.return_value = True
+        json_path = tmp_path / "reviews.json"
+        json_path.write_text(
+            json.dumps({
+                "metadata": {"owner": "o", "repo": "r", "pr_number": "1"},
+                "qodo": [{"thread_id": "t1", "status": "addressed", "path": "file.py"}],
+            })
+        )
+
+        with pytest.raises(SystemExit):
+            post_review_replies.run(str(json_path))
+
+        result = json.loads(json_path.read_text())
+        assert result["qodo"][0]["posted_at"]
+        assert result["qodo"][0]["resolved_at"]
+        assert not (tmp_path / "reviews.updates.jsonl").exists()
+
+    @patch.object(post_review_replies, "resolve_thread")
+    @patch.object(post_review_replies, "post_thread_reply")
+    @patch.object(post_review_replies, "check_dependencies")
+    def test_run_recovers_interrupted_log(
+        self, mock_deps: Any, mock_post: Any, mock_resolve: Any, tmp_path: Path
+    ) -> None:
+        """Updates left by an interrupted run should prevent re-posting the reply."""
+        del mock_deps  # Injected by @patch decorator, unused in test
+        mock_resolve.return_value = True
+        json_path = tmp_path / "reviews.json"
+        json_path.write_text(
+            json.dumps({
+                "metadata": {"owner": "o", "repo": "r", "pr_number": "1"},
+                "qodo": [{"thread_id": "t1", "status": "addressed", "path": "file.py"}],
+            })
+        )
+        post_review_replies._append_update_log(
+            tmp_path / "reviews.updates.jsonl",
+            {"cat": "qodo", "idx": 0, "field": "posted_at", "ts": "2024-01-15T10:00:00Z"},
+        )
+
+        with pytest.raises(SystemExit) as excinfo:
+            post_review_replies.run(str(json_path))
+
+        assert excinfo.value.code == 0
+        mock_post.assert_not_called()
+        mock_resolve.assert_called_once_with("t1")
+        result = json.loads(json_path.read_text())
+        assert result["qodo"][0]["posted_at"] == "2024-01-15T10:00:00Z"
+        assert result["qodo"][0]["resolved_at"]
+        assert not (tmp_path / "reviews.updates.jsonl").exists()
+
+    @patch.object(post_review_replies, "resolve_thread")
+    @patch.object(post_review_replies, "post_thread_reply")
+    @patch.object(post_review_replies, "check_dependencies")
+    def test_run_recovers_log_after_refetch_reorder(
+        self, mock_deps: Any, mock_post: Any, mock_resolve: Any, tmp_path: Path
+    ) -> None:
+        """Logged updates should follow their entry, not its old index, after a re-fetch."""
+        del mock_deps  # Injected by @patch decorator, unused in test
+        mock_post.return_value = True
+        mock_resolve.return_value = True
+        json_path = tmp_path / "reviews.json"
+        # Re-fetched JSON: the thread replied to at index 0 before the interruption is now at index 1
+        json_path.write_text(
+            json.dumps({
+                "metadata": {"owner": "o", "repo": "r", "pr_number": "1"},
+                "qodo": [
+                    {"thread_id": "t2", "status": "addressed", "path": "b.py"},
+                    {"thread_id": "t1", "status": "addressed", "path": "a.py"},
+                ],
+            })
+        )
+        log_path = tmp_path / "reviews.updates.jsonl"
+        post_review_replies._append_update_log(
+            log_path, {"cat": "qodo", "idx": 0, "key": "t:t1", "field": "posted_at", "ts": "2024-01-15T10:00:00Z"}
+        )
+        post_review_replies._append_update_log(
+            log_path, {"cat": "qodo", "idx": 5, "key": "t:gone", "field": "posted_at", "ts": "2024-01-15T10:00:00Z"}
+        )
+
+        with pytest.raises(SystemExit) as excinfo:
+            post_review_replies.run(str(json_path))
+
+        assert excinfo.value.code == 0
+        mock_post.assert_called_once()
+        assert mock_post.call_args.args[0] == "t2"
+        result = json.loads(json_path.read_text())
+        assert result["qodo"][1]["posted_at"] == "2024-01-15T10:00:00Z"
+        assert result["qodo"][0]["posted_at"] != "2024-01-15T10:00:00Z"
+        assert all(item["resolved_at"] for item in result["qodo"])
+
+
 # =============================================================================
 # Tests for main() - Status Handling
 # =============================================================================
@@ -536,12 +830,13 @@ class TestMainThreadIdResolution:
         call_args = mock_post.call_args
         assert call_args[0][0] == "real_thread_id"
 
+    @patch.object(post_review_replies, "prefetch_thread_ids")
     @patch.object(post_review_replies, "lookup_thread_id_from_node_id")
     @patch.object(post_review_replies, "resolve_thread")
     @patch.object(post_review_replies, "post_thread_reply")
     @patch.object(post_review_replies, "check_dependencies")
     def test_falls_back_to_node_id(
-        self, mock_deps: Any, mock_post: Any, mock_resolve: Any, mock_lookup: Any, tmp_path: Path
+        self, mock_deps: Any, mock_post: Any, mock_resolve: Any, mock_lookup: Any, mock_prefetch: Any, tmp_path: Path
     ) -> None:
         """Should look up thread_id from node_id if thread_id missing."""
         del mock_deps  # Injected by @patch decorator, unused in test
@@ -569,10 +864,49 @@ class TestMainThreadIdResolution:
         with pytest.raises(SystemExit):
             post_review_replies.run(str(json_path))
 
+        mock_prefetch.assert_called_once_with(["node123"])
         mock_lookup.assert_called_once_with("node123")
         call_args = mock_post.call_args
         assert call_args[0][0] == "looked_up_thread_id"
 
+    @patch.object(post_review_replies, "prefetch_thread_ids")
+    @patch.object(post_review_replies, "lookup_thread_id_from_node_id")
+    @patch.object(post_review_replies, "resolve_thread")
+    @patch.object(post_review_replies, "post_thread_reply")
+    @patch.object(post_review_replies, "check_dependencies")
+    def test_null_string_thread_id_falls_back_to_node_id(
+        self, mock_deps: Any, mock_post: Any, mock_resolve: Any, mock_lookup: Any, mock_prefetch: Any, tmp_path: Path
+    ) -> None:
+        """A literal "null" thread_id should be treated as missing."""
+        del mock_deps  # Injected by @patch decorator, unused in test
+        mock_post.return_value = True
+        mock_resolve.return_value = True
+        mock_lookup.return_value = "looked_up_thread_id"
+
+        json_path = self._create_test_json(
+            tmp_path,
+            {
+                "human": [
+                    {
+                        "thread_id": "null",
+                        "node_id": "node123",
+                        "status": "addressed",
+                        "reply": "Fixed",
+                        "path": "file.py",
+                    }
+                ],
+                "qodo": [],
+                "coderabbit": [],
+            },
+        )
+
+        with pytest.raises(SystemExit):
+            post_review_replies.run(str(json_path))
+
+        mock_prefetch.assert_called_once_with(["node123"])
+        mock_lookup.assert_called_once_with("node123")
+        assert mock_post.call_args[0][0] == "looked_up_thread_id"
+
     @patch.object(post_review_replies, "lookup_thread_id_from_node_id")
     @patch.object(post_review_replies, "resolve_thread")
     @patch.object(post_review_replies, "post_thread_reply")
@@ -1497,6 +1831,25 @@ class TestPostBodyCommentChunking:
         assert len(updates) == 0
         mock_run.assert_not_called()
 
+    @patch("subprocess.run")
+    def test_multibyte_replies_packed_by_bytes(self, mock_run: Any) -> None:
+        """Every entry reported as posted should appear in a posted body within the byte limit."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="{}", stderr="")
+
+        # 5000 CJK characters encode to 15000 bytes, so 8 of them cannot share one 55000-byte comment
+        entries = [self._make_entry(reply=f"reply-{i} " + "漢" * 5000, idx=i, path=f"src/f{i}.py") for i in range(8)]
+        body_comments = {"coderabbitai[bot]": entries}
+
+        posted, updates = post_review_replies.post_body_comment_replies("test-owner", "test-repo", "123", body_comments)
+
+        bodies = [a for call in mock_run.call_args_list for a in call.args[0] if a.startswith("body=")]
+        assert posted == len(bodies) > 1
+        assert all(len(body.encode("utf-8")) <= 55000 for body in bodies)
+        assert "[truncated]" not in "".join(bodies)
+        assert len(updates) == 8
+        for update in updates:
+            assert sum(f"reply-{update['idx']} " in body for body in bodies) == 1
+
     @patch("subprocess.run")
     def test_chunk_boundary_exact_fit(self, mock_run: Any) -> None:
         """Comments that fit within max_len should produce a single chunk."""
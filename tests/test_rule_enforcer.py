@@ -541,7 +541,7 @@ class TestMainWithMock:
             "tool_input": {"command": "python script.py"},
         }
 
-        with patch("sys.stdin.read", return_value=json.dumps(input_data)):
+        with patch("sys.stdin.buffer.read", return_value=json.dumps(input_data).encode()):
             with patch("builtins.print") as mock_print:
                 with pytest.raises(SystemExit) as exc_info:
                     main()
@@ -559,7 +559,7 @@ class TestMainWithMock:
             "tool_input": {"command": "pre-commit run --all-files"},
         }
 
-        with patch("sys.stdin.read", return_value=json.dumps(input_data)):
+        with patch("sys.stdin.buffer.read", return_value=json.dumps(input_data).encode()):
             with patch("builtins.print") as mock_print:
                 with pytest.raises(SystemExit) as exc_info:
                     main()
@@ -580,7 +580,7 @@ class TestMainWithMock:
             "tool_input": {"command": "prek run --all-files"},
         }
 
-        with patch("sys.stdin.read", return_value=json.dumps(input_data)):
+        with patch("sys.stdin.buffer.read", return_value=json.dumps(input_data).encode()):
             with patch("builtins.print") as mock_print:
                 with pytest.raises(SystemExit) as exc_info:
                     main()
@@ -595,7 +595,7 @@ class TestMainWithMock:
             "tool_input": {"command": "uv run script.py"},
         }
 
-        with patch("sys.stdin.read", return_value=json.dumps(input_data)):
+        with patch("sys.stdin.buffer.read", return_value=json.dumps(input_data).encode()):
             with patch("builtins.print") as mock_print:
                 with pytest.raises(SystemExit) as exc_info:
                     main()
@@ -610,7 +610,7 @@ class TestMainWithMock:
             "tool_input": {"file_path": "/some/file.py"},
         }
 
-        with patch("sys.stdin.read", return_value=json.dumps(input_data)):
+        with patch("sys.stdin.buffer.read", return_value=json.dumps(input_data).encode()):
             with patch("builtins.print") as mock_print:
                 with pytest.raises(SystemExit) as exc_info:
                     main()
@@ -618,9 +618,24 @@ class TestMainWithMock:
                 assert exc_info.value.code == 0
                 mock_print.assert_not_called()
 
+    def test_main_skips_parsing_non_bash_payload(self) -> None:
+        """Test main function exits before parsing payloads that are not Bash."""
+        input_data = {
+            "tool_name": "TodoWrite",
+            "tool_input": {"todos": [{"content": "python script.py"}]},
+        }
+
+        with patch("sys.stdin.buffer.read", return_value=json.dumps(input_data).encode()):
+            with patch.object(rule_enforcer.json, "loads") as mock_loads:
+                with pytest.raises(SystemExit) as exc_info:
+                    main()
+
+                assert exc_info.value.code == 0
+                mock_loads.assert_not_called()
+
     def test_main_handles_exception_gracefully(self) -> None:
         """Test main function fails open on exceptions."""
-        with patch("sys.stdin.read", side_effect=Exception("Read error")):
+        with patch("sys.stdin.buffer.read", side_effect=Exception("Read error")):
             with patch("builtins.print") as mock_print:
                 with pytest.raises(SystemExit) as exc_info:
                     main()
@@ -49,6 +49,32 @@ class TestGetProjectRoot:
 
         assert result == Path("/home/user/project")
 
+    @patch("subprocess.run")
+    def test_caches_head_sha(self, mock_run: Any) -> None:
+        """Should resolve HEAD in the same git call and reuse it for the commit SHA."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="/home/user/project\nabc123def456\n", stderr="")
+        store_reviews._head_sha_cache.clear()
+
+        try:
+            root = store_reviews.get_project_root()
+            sha = store_reviews.get_current_commit_sha(cwd=root)
+        finally:
+            store_reviews._head_sha_cache.clear()
+
+        assert root == Path("/home/user/project")
+        assert sha == "abc123def456"
+        assert mock_run.call_count == 1
+
+    @patch("subprocess.run")
+    def test_repository_without_commits(self, mock_run: Any) -> None:
+        """Should return the toplevel when HEAD cannot be resolved yet."""
+        mock_run.return_value = MagicMock(returncode=1, stdout="/home/user/project\n", stderr="")
+
+        result = store_reviews.get_project_root()
+
+        assert result == Path("/home/user/project")
+        assert result not in store_reviews._head_sha_cache
+
     @patch("subprocess.run")
     def test_exits_on_git_error(self, mock_run: Any) -> None:
         """Should exit on git rev-parse error."""
@@ -497,6 +523,47 @@ class TestInsertComment:
         conn.close()
 
 
+# =============================================================================
+# Tests for insert_comments()
+# =============================================================================
+
+
+class TestInsertComments:
+    """Tests for insert_comments() batch insertion."""
+
+    def test_inserts_batch_in_order(self, tmp_path: Path) -> None:
+        """Should insert every comment for the source and return the count."""
+        db_path = tmp_path / "test.db"
+        conn = sqlite3.connect(str(db_path))
+        store_reviews.create_tables(conn)
+
+        review_id = store_reviews.insert_review(conn, "owner", "repo", 123, "abc1234567")
+        comments = [{"body": f"comment {i}", "line": i} for i in range(3)]
+
+        inserted = store_reviews.insert_comments(conn, review_id, "coderabbit", comments)
+
+        assert inserted == 3
+        cursor = conn.execute("SELECT source, body, line FROM comments WHERE review_id = ? ORDER BY id", (review_id,))
+        assert cursor.fetchall() == [
+            ("coderabbit", "comment 0", 0),
+            ("coderabbit", "comment 1", 1),
+            ("coderabbit", "comment 2", 2),
+        ]
+        conn.close()
+
+    def test_empty_batch(self, tmp_path: Path) -> None:
+        """Should insert nothing for an empty list."""
+        db_path = tmp_path / "test.db"
+        conn = sqlite3.connect(str(db_path))
+        store_reviews.create_tables(conn)
+
+        review_id = store_reviews.insert_review(conn, "owner", "repo", 123, "abc1234567")
+
+        assert store_reviews.insert_comments(conn, review_id, "human", []) == 0
+        assert conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0] == 0
+        conn.close()
+
+
 # =============================================================================
 # Tests for store_reviews() - Main Function
 # =============================================================================
@@ -538,6 +605,21 @@ class TestStoreReviews:
         assert cursor.fetchone()[0] == 3
         conn.close()
 
+    @patch.object(store_reviews, "get_project_root")
+    def test_uses_wal_journal_mode(self, mock_root: Any, tmp_path: Path) -> None:
+        """Should switch the database to WAL journal mode."""
+        mock_root.return_value = tmp_path
+
+        data = {"metadata": {"owner": "o", "repo": "r", "pr_number": 1}, "human": [{"body": "c"}]}
+        json_path = self._create_test_json(tmp_path, data)
+
+        store_reviews.store_reviews(json_path)
+
+        db_path = tmp_path / ".claude" / "data" / "reviews.db"
+        conn = sqlite3.connect(str(db_path))
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
     @patch.object(store_reviews, "get_project_root")
     def test_creates_review_record(self, mock_root: Any, tmp_path: Path) -> None:
         """Should create review record."""